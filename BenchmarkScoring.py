@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BenchmarkScoring.py
+
+Description
+-----------
+Reproducible benchmark of the pairwise scoring paths:
+- ExamineMSA.py      : iter_pair_stats with every available engine (python, numpy, matrix, packed)
+- FastaAligner       : score_pair and score_pair_packed over all pairs
+- FastaAlignerPlotter: build_dot_matrix for one pair (L x L, so only up to --dot-max-len)
+For each size a synthetic aligned FASTA is generated (fixed seed), then each case is
+timed end to end (reading + validating + scoring every pair) and, in a separate run,
+its peak Python/NumPy memory is measured with tracemalloc. Results are written as a
+JSON report that can be compared against the report of another commit.
+
+Procedure
+1) Parse sizes "N:L" (number of sequences : alignment length), gap and N densities.
+2) For each size, write the synthetic FASTA into a temporary directory.
+3) Run every case --repeat times; keep best and mean wall time, then measure peak memory once.
+4) Write the JSON report (with git commit, Python and platform) and print a summary table.
+5) With --compare OLD.json, print the time ratio new/old for every case found in both.
+
+User-defined functions
+-   make_alignment(path, n, length, gap, ndens, seed) -> None
+    Write n aligned sequences of the given length: a random reference with point
+    mutations, gaps ('-') and uncertain bases ('N'/'?') at the given densities.
+-   load_script(name) -> module
+    Import one of the repository scripts by file name (also those without .py).
+-   measure(fn, repeat) -> Dict
+    Best/mean wall time over repeat runs and tracemalloc peak of one extra run.
+-   load_scripts() -> Dict
+    Import ExamineMSA.py, FastaAligner and DotMatrix.py (None without NumPy) once per run.
+-   build_cases(fasta_path, length, scripts, dot_max_len) -> List[Tuple[str, Callable]]
+    The benchmark cases for one synthetic alignment.
+-   compare(new, old) -> None
+    Print the time ratio of every case present in both reports.
+
+Usage
+    python BenchmarkScoring.py [--sizes 10:1000,50:5000] [--gap 0.02] [--ndens 0.01]
+                               [--repeat 3] [--seed 1] [--dot-max-len 2000]
+                               [--out bench_report.json] [--compare old_report.json]
+
+Examples
+    python BenchmarkScoring.py --out outputs/bench_$(git rev-parse --short HEAD).json
+    python BenchmarkScoring.py --sizes 200:16569 --repeat 1 --compare outputs/bench_old.json
+
+Version: 1.0
+Date   : 2025-10-24
+Author : Yiran Chen
+"""
+#%% importing library
+from pathlib import Path #object-oriented filesystem paths
+import sys #intepreter utility(e.g., argv, exit).
+import argparse #command-line options
+import importlib.machinery #loading scripts without a .py suffix
+import importlib.util
+import json #report output
+import platform #machine description for the report
+import random #synthetic sequences
+import subprocess #git commit of the benchmarked tree
+import tempfile #scratch directory for synthetic FASTA files
+import time #wall-clock timing
+import tracemalloc #peak memory
+HERE = Path(__file__).resolve().parent
+#%% the function of writing one synthetic aligned FASTA file
+def make_alignment(path, n, length, gap=0.02, ndens=0.01, seed=1, mut=0.03):
+    rng = random.Random(seed)
+    ref = [rng.choice("ACGT") for _ in range(length)]
+    with open(path, "w") as f:
+        for k in range(n):
+            seq = []
+            for base in ref:
+                x = rng.random()
+                if x < gap:
+                    seq.append("-")
+                elif x < gap + ndens:
+                    seq.append(rng.choice("N?"))
+                elif x < gap + ndens + mut:
+                    seq.append(rng.choice("ACGT"))
+                else:
+                    seq.append(base)
+            f.write(f">Sample{k}\n")
+            s = "".join(seq)
+            for i in range(0, length, 80): #80 characters per line, like FastaParser output
+                f.write(s[i:i + 80] + "\n")
+#%% the function of importing a repository script by file name
+def load_script(name):
+    path = HERE / name
+    loader = importlib.machinery.SourceFileLoader(path.stem, str(path))
+    spec = importlib.util.spec_from_loader(path.stem, loader)
+    module = importlib.util.module_from_spec(spec)
+    if str(HERE) not in sys.path:
+        sys.path.insert(0, str(HERE)) #the scripts import their sibling modules (e.g. SeqPacking)
+    loader.exec_module(module)
+    return module
+#%% the function of timing one case and measuring its peak memory
+def measure(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    #tracemalloc slows Python code down, so memory is measured in a separate run
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"best_s": min(times), "mean_s": sum(times) / len(times), "peak_mb": peak / 2**20}
+#%% the function of importing the benchmarked scripts once for all sizes
+def load_scripts():
+    scripts = {"msa": load_script("ExamineMSA.py"), "aligner": load_script("FastaAligner"), "dots": None}
+    try:
+        scripts["dots"] = load_script("DotMatrix.py") #FastaAlignerPlotter imports it only when drawing
+    except ImportError as e: #NumPy missing
+        sys.stderr.write(f"[WARN] FastaAlignerPlotter.build_dot_matrix skipped ({e})\n")
+    return scripts
+#%% the function of listing the benchmark cases for one alignment
+def build_cases(fasta_path, length, scripts, dot_max_len=2000):
+    cases = []
+    msa = scripts["msa"]
+    w = msa.load_weights("-")
+    engines = ["python", "packed"] + (["numpy", "matrix"] if msa.np is not None else [])
+    for engine in engines:
+        def run_msa(engine=engine):
+            recs = msa.read_fasta(fasta_path)
+            for _ in msa.iter_pair_stats(recs, w, engine):
+                pass
+        cases.append((f"ExamineMSA.pair_stats[{engine}]", run_msa))
+    aligner = scripts["aligner"]
+    params = aligner.PARAM_DEFAULT.copy()
+    table = aligner.score_table(params) #built once per run, like FastaAligner main
+    weights = aligner.class_weights(table)
+    def aligner_input():
+        #FastaAligner accepts only A/C/G/T/-, so uncertain bases are scored as gaps
+        recs = {k: v.replace("N", "-").replace("?", "-") for k, v in aligner.read_fasta(fasta_path).items()}
+        return aligner.validate_aligned(recs)
+    def run_score_pair():
+        ids, seqs, _ = aligner_input()
+        for i in range(len(seqs) - 1):
+            for j in range(i + 1, len(seqs)):
+                aligner.score_pair(seqs[i], seqs[j], params, table)
+    def run_score_pair_packed():
+        ids, seqs, _ = aligner_input()
+        packed = [aligner.SeqPacking.PackedSeq(s) for s in seqs]
+        for i in range(len(packed) - 1):
+            for j in range(i + 1, len(packed)):
+                aligner.score_pair_packed(packed[i], packed[j], params, weights)
+    cases.append(("FastaAligner.score_pair", run_score_pair))
+    cases.append(("FastaAligner.score_pair_packed", run_score_pair_packed))
+    dots = scripts["dots"]
+    if length > dot_max_len or dots is None:
+        return cases
+    def run_dot_matrix():
+        ids, seqs, _ = aligner_input()
+        dots.build_dot_matrix(seqs[0], seqs[1]) #one pair: the matrix is L x L
+    #case name kept from earlier reports, so --compare still matches it
+    cases.append(("FastaAlignerPlotter.build_dot_matrix", run_dot_matrix))
+    return cases
+#%% the function of comparing two reports
+def compare(new, old):
+    old_times = {(r["n"], r["length"], r["case"]): r["best_s"] for r in old["results"]}
+    print(f"\nCompared with {old.get('commit', '?')} (ratio < 1 means faster now):")
+    for r in new["results"]:
+        key = (r["n"], r["length"], r["case"])
+        if key in old_times and old_times[key] > 0:
+            print(f"  N={r['n']:<5} L={r['length']:<6} {r['case']:<42} {r['best_s'] / old_times[key]:6.2f}x")
+#%% the main function
+def parse_args(argv):
+    ap = argparse.ArgumentParser(prog="BenchmarkScoring.py",
+                                 description="Benchmark the pairwise scoring paths on synthetic alignments.")
+    ap.add_argument("--sizes", default="10:1000,50:5000",
+                    help="comma-separated N:L pairs (sequences : alignment length)")
+    ap.add_argument("--gap", type=float, default=0.02, help="fraction of '-' columns per sequence")
+    ap.add_argument("--ndens", type=float, default=0.01, help="fraction of N/? columns per sequence")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per case (best and mean reported)")
+    ap.add_argument("--seed", type=int, default=1, help="random seed of the synthetic alignments")
+    ap.add_argument("--dot-max-len", type=int, default=2000,
+                    help="largest L for which build_dot_matrix (L x L) is run")
+    ap.add_argument("--out", default="bench_report.json", help="JSON report path")
+    ap.add_argument("--compare", metavar="OLD_JSON", help="report of another commit to compare with")
+    args = ap.parse_args(argv)
+    if args.repeat < 1:
+        ap.error(f"--repeat must be at least 1 (got {args.repeat})") #measure reports the best of the runs
+    return args
+def main():
+    args = parse_args(sys.argv[1:])
+    try:
+        sizes = [tuple(int(x) for x in item.split(":")) for item in args.sizes.split(",")]
+        if any(len(size) != 2 for size in sizes):
+            raise ValueError("every size needs N:L")
+    except ValueError:
+        sys.stderr.write(f"[ERROR] --sizes must look like 10:1000,50:5000 (got {args.sizes})\n")
+        sys.exit(2)
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None #git not installed
+    report = {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+              "settings": {"gap": args.gap, "ndens": args.ndens, "repeat": args.repeat, "seed": args.seed},
+              "results": []}
+    scripts = load_scripts()
+    with tempfile.TemporaryDirectory() as tmp:
+        for n, length in sizes:
+            fasta = Path(tmp) / f"synthetic_{n}x{length}.fasta"
+            make_alignment(fasta, n, length, args.gap, args.ndens, args.seed)
+            for case, fn in build_cases(str(fasta), length, scripts, args.dot_max_len):
+                res = measure(fn, args.repeat)
+                report["results"].append(dict(n=n, length=length, case=case, **res))
+                print(f"N={n:<5} L={length:<6} {case:<42} best {res['best_s']:8.3f}s"
+                      f"  mean {res['mean_s']:8.3f}s  peak {res['peak_mb']:8.1f} MB")
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[OK] Wrote: {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+# Standard Python script entry-point guard.
+if __name__ == "__main__":
+    main()
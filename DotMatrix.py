@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DotMatrix.py
+
+Description
+-----------
+Dot-plot matrices for two aligned sequences, shared by FastaAlignerPlotter and any
+other tool (only NumPy is needed, no matplotlib). The matrix M is L x L with
+M[j, i] comparing s2[j] (row) with s1[i] (column):
+    2 = main-diagonal match (i == j, same nucleotide, not '-')
+    1 = off-diagonal match (same nucleotide, not '-')
+    0 = mismatch or any gap
+
+User-defined functions
+-   as_codes(seq: str | bytes) -> numpy.ndarray
+    Characters of a sequence as an integer array (uint8 for ASCII, uint32 otherwise).
+-   build_dot_matrix(s1, s2) -> numpy.ndarray
+    Build the 0/1/2 uint8 matrix with broadcasting: one equality mask of all
+    positions, gap rows cleared, the diagonal set by index.
+-   write_png(path, M, scale, palette) -> None
+    Write the 0/1/2 matrix as an indexed-color PNG (zlib + struct, no matplotlib):
+    one pixel (or scale x scale pixels) per cell, colors from PALETTE, row 0 at the bottom.
+-   downsample_max(M, out_rows, out_cols) -> numpy.ndarray
+    Max-pool a matrix to at most out_rows x out_cols bins (np.maximum.reduceat), so a
+    match (1) or diagonal match (2) anywhere in a bin is never lost.
+-   overview_tiles(seqs, bins) -> Iterator[Tuple[int, int, numpy.ndarray]]
+    downsample_max(build_dot_matrix(seqs[i], seqs[j]), bins) for every pair i < j, without
+    building any L x L matrix: one pass over the encoded alignment records which bases
+    occur in each bin of each sequence (4-bit masks); two bins share a match when their
+    masks overlap, and a diagonal bin holds a main-diagonal match when the pair agrees on
+    a base inside it.
+-   base_codes(seq) -> numpy.ndarray
+    A,C,G,T as 0-3 and any other character (gaps included) as 255, one uint8 per position.
+-   kmer_codes(seq, k) -> Tuple[numpy.ndarray, numpy.ndarray]
+    2-bit packed integer of every k-mer (A,C,G,T = 0-3) and a mask of the k-mers
+    that contain only A/C/G/T.
+-   kmer_hits(s1, s2, k, max_occ) -> Tuple[numpy.ndarray, numpy.ndarray]
+    Sparse dot plot: coordinates (x in s1, y in s2) of every pair of identical k-mers,
+    found by sorting the k-mer integers of s1 and binary-searching those of s2.
+    Seeds occurring more than max_occ times in s1 (low-complexity repeats) are skipped,
+    so memory grows with the number of hits, not with L x L.
+
+Version: 1.0
+Date   : 2025-10-24
+Author : Yiran Chen
+"""
+#%% importing library
+import struct #PNG chunk headers
+import zlib #PNG image data and chunk checksums
+import numpy as np
+GAP = "-"
+PALETTE = ("#FFFFFF", "#1A9E00", "#8B0000") #0 white, 1 green (match), 2 dark red (diagonal match)
+BASE2 = np.full(256, 255, dtype=np.uint8) #byte value -> 2-bit base code, 255 for anything else
+for _k, _ch in enumerate("ACGT"):
+    BASE2[ord(_ch)] = _k
+#%% the function of turning a sequence into comparable integer codes
+def as_codes(seq):
+    if isinstance(seq, (bytes, bytearray)):
+        return np.frombuffer(bytes(seq), dtype=np.uint8)
+    if seq.isascii():
+        return np.frombuffer(seq.encode("ascii"), dtype=np.uint8) #one byte per character
+    return np.frombuffer(seq.encode("utf-32-le"), dtype=np.uint32) #one code point per character
+#%% the function of building the 0/1/2 dot matrix
+def build_dot_matrix(s1, s2):
+    if len(s1) != len(s2): #check if the length is equal
+        raise ValueError("Sequences must have equal length.")
+    a, b = as_codes(s1), as_codes(s2)
+    if a.dtype != b.dtype: #one ASCII and one non-ASCII sequence: compare code points
+        a, b = a.astype(np.uint32), b.astype(np.uint32)
+    L = len(a)
+    gap = ord(GAP)
+    M = np.empty((L, L), dtype=np.uint8)
+    #M[j, i] = s2[j] == s1[i]; the bool result is written straight into the uint8 buffer
+    np.equal(b[:, None], a[None, :], out=M.view(np.bool_))
+    M[b == gap, :] = 0 #equal to a gap means both are gaps: white(0)
+    diag = np.flatnonzero((a == b) & (a != gap))
+    M[diag, diag] = 2 #main-diagonal matches are dark red
+    return M
+#%% the function of writing the matrix directly as a PNG image
+def png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+def write_png(path, M, scale=1, palette=PALETTE, level=6):
+    if scale < 1:
+        raise ValueError("scale must be a positive integer.")
+    img = M[::-1] #PNG rows run top to bottom; row 0 of the dot plot is drawn at the bottom
+    if scale > 1:
+        img = np.repeat(np.repeat(img, scale, axis=0), scale, axis=1)
+    h, w = img.shape
+    rows = np.zeros((h, w + 1), dtype=np.uint8) #every PNG row starts with filter type 0 (none)
+    rows[:, 1:] = img
+    plte = b"".join(bytes.fromhex(c.lstrip("#")) for c in palette)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 3, 0, 0, 0))) #8-bit palette indices
+        f.write(png_chunk(b"PLTE", plte))
+        f.write(png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)))
+        f.write(png_chunk(b"IEND", b""))
+#%% the function of max-pooling a matrix down to the output resolution
+def bin_starts(n, bins):
+    #first index of each of min(n, bins) nearly equal bins covering 0..n-1
+    return np.linspace(0, n, min(n, bins) + 1).astype(np.intp)[:-1]
+def downsample_max(M, out_rows, out_cols=None):
+    out_cols = out_rows if out_cols is None else out_cols
+    rows, cols = M.shape
+    if rows == 0 or cols == 0 or (rows <= out_rows and cols <= out_cols):
+        return M
+    P = np.maximum.reduceat(M, bin_starts(rows, out_rows), axis=0)
+    return np.maximum.reduceat(P, bin_starts(cols, out_cols), axis=1)
+#%% the function of computing the max-pooled dot matrices of all pairs in one pass
+def overview_tiles(seqs, bins=200):
+    L = len(seqs[0])
+    if any(len(s) != L for s in seqs):
+        raise ValueError("Sequences must have equal length.")
+    C = np.stack([base_codes(s) for s in seqs]) #N x L, 0-3 or 255
+    ok = C != 255
+    starts = bin_starts(L, bins)
+    #bases present in every bin of every sequence: bit c set when base c occurs in the bin
+    bits = np.where(ok, np.left_shift(1, C & 3), 0).astype(np.uint8)
+    P = np.bitwise_or.reduceat(bits, starts, axis=1) #N x bins
+    idx = np.arange(len(starts))
+    for i in range(len(seqs) - 1):
+        #bins where sequence i agrees with each later sequence on a base: main-diagonal matches
+        same = (C[i + 1:] == C[i]) & ok[i]
+        D = np.add.reduceat(same, starts, axis=1) > 0
+        for k, j in enumerate(range(i + 1, len(seqs))):
+            #rows: bins of sequence j (y), columns: bins of sequence i (x), like build_dot_matrix
+            T = ((P[j][:, None] & P[i][None, :]) != 0).astype(np.uint8)
+            diag = idx[D[k]]
+            T[diag, diag] = 2
+            yield i, j, T
+#%% the function of turning a sequence into 2-bit base codes
+def base_codes(seq):
+    c = as_codes(seq)
+    if c.dtype == np.uint8:
+        return BASE2[c]
+    return np.where(c < 256, BASE2[np.minimum(c, 255)], 255).astype(np.uint8)
+#%% the function of turning every k-mer into one 2-bit packed integer
+def kmer_codes(seq, k):
+    if not 0 < k <= 32:
+        raise ValueError("k must be between 1 and 32 (2 bits per base in 64 bits).")
+    c = base_codes(seq)
+    n = len(c) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+    bad = np.concatenate(([0], np.cumsum(c == 255))) #running count of non-ACGT positions
+    valid = (bad[k:] - bad[:n]) == 0 #k-mer without gaps or other characters
+    vals = np.zeros(n, dtype=np.uint64)
+    for t in range(k): #append one base (2 bits) per step to all k-mers at once
+        vals = (vals << np.uint64(2)) | (c[t:t + n] & 3).astype(np.uint64)
+    return vals, valid
+#%% the function of finding all pairs of identical k-mers (sparse dot plot)
+def kmer_hits(s1, s2, k=11, max_occ=50):
+    v1, ok1 = kmer_codes(s1, k)
+    v2, ok2 = kmer_codes(s2, k)
+    x_pos = np.flatnonzero(ok1)
+    order = np.argsort(v1[x_pos], kind="stable")
+    keys, x_sorted = v1[x_pos][order], x_pos[order] #seed index of s1: sorted k-mers and their positions
+    y_pos = np.flatnonzero(ok2)
+    lo = np.searchsorted(keys, v2[y_pos], side="left")
+    hi = np.searchsorted(keys, v2[y_pos], side="right")
+    cnt = hi - lo #occurrences in s1 of each k-mer of s2
+    keep = (cnt > 0) & (cnt <= max_occ)
+    lo, cnt = lo[keep], cnt[keep]
+    y = np.repeat(y_pos[keep], cnt)
+    #expand every range lo..hi-1 without a Python loop
+    starts = np.repeat(lo - (np.cumsum(cnt) - cnt), cnt)
+    x = x_sorted[starts + np.arange(len(y))]
+    return x, y
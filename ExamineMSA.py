@@ -40,6 +40,61 @@ User-defined functions
 -   pair_stats(a: str, b: str, w: Dict[str, float]) -> Tuple[int, int, int, float, float]
     Compute pairwise metrics for two aligned sequences:
     (comparable, uncertain, total, identity_pct, score)
+-   pair_counts(a: str, b: str, w: Dict[str, float]) -> Tuple[int, int, int, float]
+    The column counts behind pair_stats: (comparable, uncertain, identical, score).
+    All engines produce these counts; finish_stats turns them into the output stats.
+-   finish_stats(counts, total) -> Tuple[int, int, int, float, float]
+    (comparable, uncertain, total, identity_pct, score) from the counts of a pair.
+-   encode_seq(s: str) -> numpy.ndarray
+    Encode a cleaned sequence once into a uint8 code array (A,C,G,T=0-3, N,?,-=4-6).
+-   pair_counts_np(a: ndarray, b: ndarray, w: Dict[str, float]) -> Tuple[int, int, int, float]
+    Same counts as pair_counts, computed with array operations on encoded sequences.
+-   pair_counts_packed(a: PackedSeq, b: PackedSeq, w: Dict[str, float]) -> Tuple[int, int, int, float]
+    Same counts as pair_counts from 4-bit packed sequences (SeqPacking byte-pair table).
+-   encode_alignment(recs) -> numpy.ndarray
+    Encode the whole alignment once as an N x L uint8 code matrix.
+-   batch_pair_counts(M, i, w, chunk_rows) -> Iterator[Tuple[int, Tuple]]
+    Compare row i of the code matrix against all later rows, a chunk of rows at a time.
+-   prepare_engine(recs, w, engine, chunk_mb) -> Tuple
+    Encode the alignment once in the form the selected engine needs.
+-   score_rows(data, w, engine, i0, i1) -> Iterator[Tuple[int, int, Tuple]]
+    Yield (i, j, counts) for rows i0 <= i < i1 against all later rows.
+-   row_blocks(n, jobs) -> List[Tuple[int, int]]
+    Split the pair space into row blocks with a similar number of pairs.
+-   column_profile(recs) -> Dict
+    One pass over the columns: count invariant (same A/C/G/T everywhere) and all-uncertain
+    (only N/?/-) columns and list the polymorphic columns.
+-   reduce_alignment(recs, profile) -> List[Tuple[str, str]]
+    Keep only the polymorphic columns of every sequence.
+-   add_profile(counts, profile, w) -> Tuple[int, int, int, float]
+    Add the invariant and all-uncertain columns back to the counts of a reduced pair.
+-   iter_pair_stats(recs, w, engine, chunk_mb, jobs, skip_invariant) -> Iterator[Tuple[int, int, Tuple]]
+    Yield (i, j, stats) for every pair i < j using the selected engine, in a process pool if jobs > 1.
+-   score_against(data, w, engine, i, js) -> Iterator[Tuple[int, Tuple]]
+    Count row i against the rows js (default: all later rows).
+-   seq_digest(seq) -> str
+    Content hash of a sequence, used as pair cache key.
+-   weights_digest(w) -> str
+    Content hash of the scoring weights, part of every pair cache key.
+-   open_cache(path) -> sqlite3.Connection
+    Open (or create) the pair cache; entries of all weights are kept side by side.
+-   iter_cached_pair_stats(recs, w, cache_path, engine, chunk_mb, skip_invariant, tally, jobs) -> Iterator
+    Like iter_pair_stats, but reuse cached pairs and score and store only the missing ones
+    (in a process pool if jobs > 1).
+-   format_row(a_name, b_name, stats) -> str
+    Format one output table row (score as integer if exact, else rounded to 3 decimals).
+-   write_tsv(path, names, rows, compress, batch_rows) -> None
+    Stream rows into the text table in batches, optionally gzip-compressed.
+-   write_columnar(path, names, rows, batch_rows) -> None
+    Stream rows into a binary columnar file with constant memory.
+-   load_columnar(path) -> Tuple[List[str], Dict[str, numpy.memmap]]
+    Load a columnar file as sample names and memory-mapped column arrays.
+-   write_condensed(path, names, rows, batch_rows) -> None
+    Stream identity and score into condensed upper-triangle float32 arrays.
+-   load_condensed(path) -> Tuple[List[str], numpy.memmap, numpy.memmap]
+    Load a condensed file as sample names, identity and score arrays.
+-   condensed_index(n, i, j) -> int
+    Position of pair (i, j) in a condensed array of n samples.
 
 Inputs
 - <fasta_file>       : aligned FASTA with at least two sequences
@@ -49,13 +104,55 @@ Inputs
 Outputs
 - A table with columns and scores:
    SampleA | SampleB | Comparable | Uncertain | Total | Identity% | Score
+- or, with --format columnar, a binary file: 8-byte magic "EMSACOL1", uint64 header size,
+  JSON header (sample names, row count, column dtypes and offsets), then the columns
+  i, j, comparable, uncertain, total (uint32) and identity_pct, score (float64).
+- or, with --format condensed, the same container (magic "EMSACND1") holding identity_pct and
+  score as two float32 arrays of length N*(N-1)/2 in upper-triangle order (pairs i < j, row by
+  row, as scipy.spatial.distance.squareform expects). load_condensed() memory-maps them and
+  condensed_index(n, i, j) gives the position of a pair.
+
+Options
+- --engine python|numpy|matrix|packed : scoring engine (default python; numpy/matrix need NumPy).
+                         numpy scores one pair at a time; matrix scores a row against all
+                         later rows in batched chunks; packed keeps every sequence as 4-bit
+                         codes (SeqPacking, half a byte per column; the str sequences are
+                         released once packed) and counts columns with a byte-pair lookup
+                         table. All engines write byte-identical tables.
+- --chunk-mb MB        : memory budget for one batch of the matrix engine (default 64).
+- --jobs N             : score row blocks in N worker processes (default 1). Rows are still
+                         written in the same i < j order; at most 2*N blocks of up to
+                         BLOCK_PAIRS pairs are in flight, so memory does not grow with N^2.
+- --skip-invariant     : find invariant and all-uncertain columns once, add their contribution
+                         analytically and compare only polymorphic columns per pair
+                         (O(N^2*S) instead of O(N^2*L)). Used only with integral weights, where
+                         the result is identical; fractional weights fall back to all columns.
+- --cache DB           : incremental mode. Pair results are kept in a SQLite file keyed by the
+                         content hashes of both sequences and the load_weights values; a rerun
+                         scores only pairs that are not cached for these weights (e.g. new
+                         samples against all) and writes the merged table. Entries for other
+                         weights stay in the file. With --jobs, the missing pairs of each row
+                         are scored in the worker pool.
+- --format tsv|gz|columnar|condensed : output type (default tsv). Rows are streamed in batches,
+                         so memory stays constant. gz is the same table gzip-compressed; columnar
+                         is a binary file with one contiguous array per column that load_columnar()
+                         memory-maps without parsing; condensed keeps only identity and score.
 
 Usage
      python ExamineMSA.py <fasta_file> <weights_file_or_-> <output_file>
+                          [--engine python|numpy|matrix|packed] [--chunk-mb MB] [--jobs N]
+                          [--skip-invariant] [--cache DB] [--format tsv|gz|columnar|condensed]
 
 Examples
    python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv
    python ExamineMSA.py outputs/Group6_Y.fasta weights.tsv outputs/Y_6_pairwise.tsv
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv --engine numpy
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv --engine matrix
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv --engine matrix --jobs 32
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv --engine matrix --skip-invariant
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv.gz --format gz
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.tsv --cache outputs/mtDNA_pairs.sqlite
+   python ExamineMSA.py outputs/Group6_mtDNA.fasta - outputs/mtDNA_6_pairwise.cnd --format condensed
 
 Exit codes
 0 : success
@@ -71,8 +168,29 @@ Author : Yiran Chen
 #%% importing library
 from pathlib import Path #object-oriented filesystem paths
 import sys #intepreter utility(e.g., argv, exit).
+import argparse #command-line options
+import multiprocessing #process pool for --jobs
+from collections import deque #row blocks in flight
+import operator #itemgetter for picking polymorphic columns
+import hashlib #content hashes for the pair cache
+import sqlite3 #persistent pair cache
+import functools #lazily built lookup tables
+import SeqPacking #4-bit packed sequences shared with FastaAligner
+import gzip #compressed table output
+import json #header of the binary output files
+import struct #fixed-size fields of the binary output files
+try:
+    import numpy as np #optional: only needed by the vectorized engine
+except ImportError:
+    np = None
 #%% global definition of allowed character set
 ALLOWED = set("ACGTN?-")
+#%% integer codes used by the vectorized engines (shared with SeqPacking); any other character gets code 7
+CODES = SeqPacking.CODES
+OTHER_CODE = SeqPacking.OTHER_CODE
+#column classes, in the same order as the branches of pair_stats
+MATCH, MISMATCH, GAP, UNKNOWN = 0, 1, 2, 3
+CLASS_KEYS = ("MATCH", "MISMATCH", "GAP", "UNKNOWN")
 #%% the function of read aligned fasta file to (name,sequence) tuple
 def read_fasta(path):
     name = None # current header (without '>'); None means no active header now
@@ -117,7 +235,8 @@ def check_aligned(recs):
     return next(iter(lengths)) #return the single common length
 #%% the function of calculating pairwise stats between two aligned sequences
 def pair_stats(a,b,w):#a and b as string seqs, w as a dic for key and float value
-    total = len(a) #alignment length (assumed equal to len(b))
+    return finish_stats(pair_counts(a, b, w), len(a)) #total: alignment length (assumed equal to len(b))
+def pair_counts(a,b,w):
     comp = 0 #count of comparable columns (both in A/C/G/T).
     unc  = 0 #count of uncertain columns (any side in N/?/-).
     ident = 0 #count of identical A/C/G/T matches.
@@ -139,14 +258,401 @@ def pair_stats(a,b,w):#a and b as string seqs, w as a dic for key and float valu
               score += w["GAP"]      # treat '-', '?', 'N' ALL as GAP for scoring
           else:
               score += w["UNKNOWN"]  # fallback; almost never used with current cleaning
+    return comp, unc, ident, score
+#%% the function of turning the column counts of a pair into the output stats
+def finish_stats(counts, total):
+    comp, unc, ident, score = counts
     identity_pct = (100.0 * ident / total) if total > 0 else 0.0 #calculate percentage of identity
     return comp, unc, total, identity_pct, score
+#%% lookup tables for the vectorized engine
+def _column_class(x, y):
+    #classify one column exactly like the branches of pair_stats
+    if x in "ACGT" and y in "ACGT":
+        return MATCH if x == y else MISMATCH
+    if (x in "-?N") or (y in "-?N"):
+        return GAP
+    return UNKNOWN
+def _build_tables():
+    code_lut = np.full(256, OTHER_CODE, dtype=np.uint8) #byte value -> code
+    for k, ch in enumerate(CODES):
+        code_lut[ord(ch)] = k
+    chars = CODES + "X" #"X" stands for any character outside ACGTN?-
+    pair_class = np.zeros(64, dtype=np.uint8) #index (code_a << 3) | code_b -> column class
+    for ka, x in enumerate(chars):
+        for kb, y in enumerate(chars):
+            pair_class[(ka << 3) | kb] = _column_class(x, y)
+    return code_lut, pair_class
+CODE_LUT, PAIR_CLASS = _build_tables() if np is not None else (None, None)
+#%% the function of encoding one cleaned sequence into uint8 codes
+def encode_seq(s):
+    #read_fasta output is pure ASCII; other characters become '?' bytes here
+    return CODE_LUT[np.frombuffer(s.encode("ascii", "replace"), dtype=np.uint8)]
+#%% the function of summing per-column weights in the same order as pair_stats
+def _integral_weights(w):
+    return all(float(w[k]).is_integer() for k in CLASS_KEYS)
+def _class_score(cls, counts, w):
+    if _integral_weights(w):
+        #every partial sum is an exact integer, so counts * weights equals the column-by-column sum
+        return float(sum(int(c) * w[k] for c, k in zip(counts, CLASS_KEYS)))
+    if len(cls) == 0:
+        return 0.0
+    #fractional weights: accumulate left to right so float rounding matches pair_stats bit for bit
+    per_col = np.array([w[k] for k in CLASS_KEYS], dtype=np.float64)[cls]
+    return float(np.add.accumulate(per_col)[-1])
+#%% the function of calculating pairwise stats between two encoded sequences
+def pair_counts_np(a, b, w):#a and b as uint8 code arrays from encode_seq
+    cls = PAIR_CLASS[(a << 3) | b] #column class of every column at once
+    counts = np.bincount(cls, minlength=4) #number of MATCH, MISMATCH, GAP, UNKNOWN columns
+    ident = int(counts[MATCH])
+    comp = ident + int(counts[MISMATCH])
+    unc = int(counts[GAP]) + int(counts[UNKNOWN])
+    score = _class_score(cls, counts, w)
+    return comp, unc, ident, score
+#%% the function of calculating pairwise stats between two 4-bit packed sequences
+@functools.lru_cache(maxsize=None)
+def _packed_table():
+    chars = SeqPacking.CHARS
+    return SeqPacking.pair_table(lambda x, y: _column_class(chars[min(x, OTHER_CODE)], chars[min(y, OTHER_CODE)]), 4)
+def pair_counts_packed(a, b, w):#a and b as SeqPacking.PackedSeq
+    if not _integral_weights(w):
+        #fractional weights need the column order for an identical float sum
+        return pair_counts(str(a), str(b), w)
+    ident, mism, gap, unk = SeqPacking.class_counts(a, b, _packed_table())
+    score = float(ident * w["MATCH"] + mism * w["MISMATCH"] + gap * w["GAP"] + unk * w["UNKNOWN"])
+    return ident + mism, gap + unk, ident, score
+#%% the function of encoding the whole alignment into one N x L code matrix
+def encode_alignment(recs):
+    M = np.empty((len(recs), check_aligned(recs)), dtype=np.uint8)
+    for k, (_, s) in enumerate(recs):
+        M[k] = encode_seq(s)
+    return M
+#%% the function of comparing one row against all later rows in batched chunks
+def batch_pair_counts(M, i, w, chunk_rows, js=None):
+    n, total = M.shape
+    others = range(i + 1, n) if js is None else js #default: all later rows
+    exact = _integral_weights(w)
+    weights = np.array([w[k] for k in CLASS_KEYS], dtype=np.float64)
+    shifted = M[i] << 3 #code_a part of the PAIR_CLASS index, shared by the whole row
+    for c0 in range(0, len(others), chunk_rows):
+        part = others[c0:c0 + chunk_rows]
+        rows = M[part.start:part.stop] if isinstance(part, range) else M[part]
+        cls = PAIR_CLASS[shifted | rows] #len(part) x L column classes
+        counts = [np.count_nonzero(cls == k, axis=1) for k in (MATCH, MISMATCH, GAP)]
+        counts.append(total - counts[0] - counts[1] - counts[2]) #the rest of the columns are UNKNOWN
+        if not exact and total > 0:
+            #fractional weights: left-to-right accumulation per row, like pair_stats
+            scores = np.add.accumulate(weights[cls], axis=1)[:, -1]
+        for r, j in enumerate(part):
+            ident, mism, gap, unk = (int(c[r]) for c in counts)
+            if exact:
+                score = float(ident * w["MATCH"] + mism * w["MISMATCH"] + gap * w["GAP"] + unk * w["UNKNOWN"])
+            else:
+                score = float(scores[r]) if total > 0 else 0.0
+            yield j, (ident + mism, gap + unk, ident, score)
+#%% the function of encoding the alignment once for the selected engine
+def prepare_engine(recs, w, engine="python", chunk_mb=64):
+    if engine == "matrix":
+        M = encode_alignment(recs)
+        #bytes per compared row: uint8 classes, plus float64 per-column scores for fractional weights
+        row_bytes = max(1, M.shape[1]) * (1 if _integral_weights(w) else 9)
+        return M, max(1, int(chunk_mb * 2**20) // row_bytes)
+    if engine == "numpy":
+        return [encode_seq(s) for _, s in recs], None #encode each sequence only once
+    if engine == "packed":
+        return [SeqPacking.PackedSeq(s) for _, s in recs], None #two columns per byte
+    return [s for _, s in recs], None
+#%% the function of scoring rows i0..i1-1 against all later rows
+def score_rows(data, w, engine, i0, i1):
+    for i in range(i0, i1):
+        for j, counts in score_against(data, w, engine, i):
+            yield i, j, counts
+#%% the function of scoring row i against the rows js (default: all later rows)
+def score_against(data, w, engine, i, js=None):
+    seqs, chunk_rows = data
+    if engine == "matrix":
+        yield from batch_pair_counts(seqs, i, w, chunk_rows, js)
+        return
+    counts = {"numpy": pair_counts_np, "packed": pair_counts_packed}.get(engine, pair_counts)
+    for j in (range(i + 1, len(seqs)) if js is None else js):
+        yield j, counts(seqs[i], seqs[j], w)
+#%% the function of splitting the pair space into row blocks of similar size
+BLOCK_PAIRS = 10000 #at most this many pairs per block (one row may exceed it), returned as one list
+def row_blocks(n, jobs):
+    total = n * (n - 1) // 2
+    #several blocks per worker keeps the pool busy; the cap bounds memory held per block
+    target = min(BLOCK_PAIRS, max(1000, total // (max(1, jobs) * 8)))
+    blocks = []
+    i0 = 0
+    pairs = 0
+    for i in range(n):
+        pairs += n - 1 - i
+        if pairs >= target or i == n - 1:
+            blocks.append((i0, i + 1))
+            i0, pairs = i + 1, 0
+    return blocks
+#%% process pool workers: the encoded alignment is handed over once per worker
+_WORKER = {}
+def _init_worker(data, w, engine):
+    _WORKER.update(data=data, w=w, engine=engine)
+def _score_block(block):
+    return list(score_rows(_WORKER["data"], _WORKER["w"], _WORKER["engine"], *block))
+def _score_missing(task):
+    i, js = task
+    return list(score_against(_WORKER["data"], _WORKER["w"], _WORKER["engine"], i, js))
+#%% the function of finding columns whose contribution is the same for every pair
+def column_profile(recs):
+    total = check_aligned(recs)
+    keep = [] #polymorphic columns, the only ones compared per pair
+    invariant = 0 #columns with one identical A/C/G/T in every sequence: MATCH for every pair
+    uncertain = 0 #columns with only N/?/- in every sequence: GAP for every pair
+    for k, col in enumerate(zip(*(s for _, s in recs))):
+        kinds = set(col)
+        if len(kinds) == 1 and col[0] in "ACGT":
+            invariant += 1
+        elif kinds <= {"N", "?", "-"}:
+            uncertain += 1
+        else:
+            keep.append(k)
+    return {"keep": keep, "invariant": invariant, "uncertain": uncertain, "total": total}
+#%% the function of keeping only the polymorphic columns of every sequence
+def reduce_alignment(recs, profile):
+    keep = profile["keep"]
+    if not keep:
+        return [(name, "") for name, _ in recs]
+    if len(keep) == 1:
+        return [(name, s[keep[0]]) for name, s in recs]
+    pick = operator.itemgetter(*keep)
+    return [(name, "".join(pick(s))) for name, s in recs]
+#%% the function of adding the invariant columns back to the counts of a reduced pair
+def add_profile(counts, profile, w):
+    comp, unc, ident, score = counts
+    #invariant columns are identical comparable columns, all-uncertain ones are GAP for every pair
+    score += profile["invariant"] * w["MATCH"] + profile["uncertain"] * w["GAP"]
+    return (comp + profile["invariant"], unc + profile["uncertain"], ident + profile["invariant"], score)
+#%% the function of iterating over all pairs (i < j) with the selected engine
+def iter_pair_stats(recs, w, engine="python", chunk_mb=64, jobs=1, skip_invariant=False):
+    total = check_aligned(recs) #full alignment length, also when only polymorphic columns are compared
+    profile = None
+    if skip_invariant and _integral_weights(w):
+        #analytic totals are only bit-identical to the column-by-column sum for integral weights
+        profile = column_profile(recs)
+        recs = reduce_alignment(recs, profile)
+    data = prepare_engine(recs, w, engine, chunk_mb)
+    n = len(recs)
+    del recs #the caller hands the records over: once encoded, the str sequences can be freed
+    if jobs <= 1:
+        rows = score_rows(data, w, engine, 0, n)
+    else:
+        rows = _pooled_rows(data, w, engine, row_blocks(n, jobs), jobs)
+    for i, j, counts in rows:
+        if profile is not None:
+            counts = add_profile(counts, profile, w)
+        yield i, j, finish_stats(counts, total)
+def _pooled_rows(data, w, engine, blocks, jobs):
+    for rows in _pooled(_score_block, blocks, data, w, engine, jobs):
+        yield from rows
+def _pooled(func, tasks, data, w, engine, jobs):
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(data, w, engine)) as pool:
+        window = deque() #at most 2*jobs tasks in flight, so workers cannot run far ahead of the writer
+        for task in tasks:
+            window.append(pool.apply_async(func, (task,)))
+            if len(window) >= 2 * jobs:
+                yield window.popleft().get() #oldest first: rows keep the deterministic i < j order
+        while window:
+            yield window.popleft().get()
+#%% persistent pair cache: results keyed by the content hashes of both sequences
+def seq_digest(seq):
+    return hashlib.sha1(seq.encode("utf-8")).hexdigest()
+def weights_digest(w):
+    key = json.dumps({k: w[k] for k in sorted(w)}) #the weights a cached score was computed with
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+def open_cache(path):
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE IF NOT EXISTS pair_scores (weights TEXT, a TEXT, b TEXT, comparable INTEGER,"
+                " uncertain INTEGER, total INTEGER, identity_pct REAL, score REAL,"
+                " PRIMARY KEY (weights, a, b)) WITHOUT ROWID")
+    con.execute("CREATE INDEX IF NOT EXISTS pair_scores_b ON pair_scores (weights, b)")
+    return con
+#%% the function of iterating over all pairs, scoring only pairs missing from the cache
+def iter_cached_pair_stats(recs, w, cache_path, engine="python", chunk_mb=64, skip_invariant=False, tally=None, jobs=1):
+    tally = {} if tally is None else tally
+    tally.update(reused=0, computed=0)
+    digests = [seq_digest(s) for _, s in recs] #hashes of the full (not reduced) sequences
+    total = check_aligned(recs)
+    profile = None
+    if skip_invariant and _integral_weights(w):
+        profile = column_profile(recs)
+        recs = reduce_alignment(recs, profile)
+    data = prepare_engine(recs, w, engine, chunk_mb)
+    n = len(recs)
+    del recs
+    wd = weights_digest(w)
+    con = open_cache(cache_path)
+    queued = deque() #(i, cached) of the rows handed to the scorer, oldest first
+    def tasks():
+        for i in range(n):
+            d = digests[i]
+            cached = {} #other digest -> stats, only for pairs that involve row i under these weights
+            for a, b, *stats in con.execute("SELECT a, b, comparable, uncertain, total, identity_pct, score"
+                                            " FROM pair_scores WHERE weights = ? AND a = ? UNION ALL"
+                                            " SELECT a, b, comparable, uncertain, total, identity_pct, score"
+                                            " FROM pair_scores WHERE weights = ? AND b = ?", (wd, d, wd, d)):
+                cached[b if a == d else a] = tuple(stats)
+            queued.append((i, cached))
+            yield i, [j for j in range(i + 1, n) if digests[j] not in cached]
+    try:
+        if jobs <= 1:
+            scored = (list(score_against(data, w, engine, i, missing)) for i, missing in tasks())
+        else:
+            #only the missing pairs of each row go to the workers, at most 2*jobs rows in flight
+            scored = _pooled(_score_missing, tasks(), data, w, engine, jobs)
+        for results in scored:
+            i, cached = queued.popleft()
+            d = digests[i]
+            fresh = {}
+            for j, counts in results:
+                fresh[j] = finish_stats(add_profile(counts, profile, w) if profile else counts, total)
+            con.executemany("INSERT OR REPLACE INTO pair_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(wd,) + tuple(sorted((d, digests[j]))) + fresh[j] for j in fresh])
+            con.commit()
+            tally["computed"] += len(fresh)
+            tally["reused"] += n - 1 - i - len(fresh)
+            for j in range(i + 1, n):
+                yield i, j, fresh[j] if j in fresh else cached[digests[j]]
+    finally:
+        con.close()
+#%% the function of formatting one output table row
+def format_row(a_name, b_name, stats):
+    comp, unc, tot, ident_pct, sc = stats
+    # formatting output score : integer if exact, else rounded to 3 decimals.
+    sc_out = int(sc) if float(sc).is_integer() else round(sc, 3)
+    # output line formatting
+    return f"{a_name} | {b_name} | {comp} | {unc} | {tot} | {ident_pct:.1f}% | {sc_out}\n"
+#%% the function of streaming the text table in batches (optionally gzip-compressed)
+HEADER = "SampleA | SampleB | Comparable | Uncertain | Total | Identity% | Score\n"
+def write_tsv(path, names, rows, compress=False, batch_rows=10000):
+    opener = gzip.open(path, "wt", compresslevel=6, newline="") if compress else open(path, "w", newline="")
+    with opener as f:
+        f.write(HEADER) #formatting output table header
+        buf = [] #at most batch_rows formatted lines are held at a time
+        for i, j, stats in rows:
+            buf.append(format_row(names[i], names[j], stats))
+            if len(buf) >= batch_rows:
+                f.write("".join(buf)) #one write call per batch instead of per row
+                buf.clear()
+        f.write("".join(buf))
+#%% binary output files: magic, header length, JSON header, then 64-byte aligned arrays
+def _write_binary_header(f, magic, meta):
+    blob = json.dumps(meta).encode("utf-8")
+    f.write(magic + struct.pack("<Q", len(blob)) + blob)
+    f.write(b"\0" * (-f.tell() % 64)) #pad so the arrays start on a 64-byte boundary
+    return f.tell()
+def _read_binary_header(path, magic):
+    with open(path, "rb") as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"{path} is not a {magic.decode()} file")
+        (size,) = struct.unpack("<Q", f.read(8))
+        meta = json.loads(f.read(size).decode("utf-8"))
+        start = f.tell() + (-f.tell() % 64)
+    return meta, start
+def _align64(n):
+    return n + (-n % 64)
+#%% the function of streaming rows into a binary file with one contiguous array per column
+def _stream_columns(path, magic, meta, columns, values, n_rows, batch_rows=100000):
+    layout = []
+    offset = 0
+    for col, dt in columns:
+        layout.append({"name": col, "dtype": dt, "offset": offset})
+        offset = _align64(offset + n_rows * np.dtype(dt).itemsize)
+    with open(path, "wb") as f:
+        start = _write_binary_header(f, magic, dict(meta, rows=n_rows, columns=layout))
+        f.truncate(start + offset) #reserve every column up front, then fill them batch by batch
+        buf = [[] for _ in columns]
+        written = 0
+        def flush():
+            nonlocal written
+            count = len(buf[0])
+            for (_, dt), spec, col_values in zip(columns, layout, buf):
+                arr = np.asarray(col_values, dtype=dt)
+                f.seek(start + spec["offset"] + written * arr.itemsize)
+                f.write(arr.tobytes())
+                col_values.clear()
+            written += count
+        for row in values:
+            for col_values, v in zip(buf, row):
+                col_values.append(v)
+            if len(buf[0]) >= batch_rows:
+                flush()
+        flush()
+def _load_columns(path, magic):
+    meta, start = _read_binary_header(path, magic)
+    cols = {spec["name"]: np.memmap(path, dtype=spec["dtype"], mode="r",
+                                    offset=start + spec["offset"], shape=(meta["rows"],))
+            for spec in meta["columns"]}
+    return meta, cols
+#%% the function of streaming the table as binary columns
+COLUMNAR_MAGIC = b"EMSACOL1"
+COLUMNS = (("i", "<u4"), ("j", "<u4"), ("comparable", "<u4"), ("uncertain", "<u4"),
+           ("total", "<u4"), ("identity_pct", "<f8"), ("score", "<f8"))
+def write_columnar(path, names, rows, batch_rows=100000):
+    n_rows = len(names) * (len(names) - 1) // 2 #one row per pair i < j
+    values = ((i, j) + tuple(stats) for i, j, stats in rows)
+    _stream_columns(path, COLUMNAR_MAGIC, {"names": list(names)}, COLUMNS, values, n_rows, batch_rows)
+#%% the function of loading a columnar table as memory-mapped arrays (no parsing)
+def load_columnar(path):
+    meta, cols = _load_columns(path, COLUMNAR_MAGIC)
+    return meta["names"], cols
+#%% the function of writing identity and score as condensed upper-triangle float32 arrays
+CONDENSED_MAGIC = b"EMSACND1"
+CONDENSED_COLUMNS = (("identity_pct", "<f4"), ("score", "<f4"))
+def write_condensed(path, names, rows, batch_rows=100000):
+    #rows arrive in i < j order, which is exactly the condensed (scipy squareform) order
+    n_rows = len(names) * (len(names) - 1) // 2
+    values = ((stats[3], stats[4]) for _, _, stats in rows)
+    _stream_columns(path, CONDENSED_MAGIC, {"names": list(names)}, CONDENSED_COLUMNS, values, n_rows, batch_rows)
+#%% the function of loading a condensed matrix as memory-mapped arrays (no parsing)
+def load_condensed(path):
+    meta, cols = _load_columns(path, CONDENSED_MAGIC)
+    return meta["names"], cols["identity_pct"], cols["score"]
+#%% the function of locating pair (i, j) in a condensed array
+def condensed_index(n, i, j):
+    if i > j:
+        i, j = j, i
+    if i == j:
+        raise ValueError("condensed arrays have no diagonal entries")
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
 #%% the main function
+def parse_args(argv):
+    ap = argparse.ArgumentParser(
+        prog="ExamineMSA.py",
+        usage="python ExamineMSA.py fasta_file weight_parameters output_file "
+              "[--engine python|numpy|matrix|packed] [--chunk-mb MB] [--jobs N] [--skip-invariant] [--cache DB] [--format tsv|gz|columnar|condensed]")
+    ap.add_argument("fasta_file")
+    ap.add_argument("weights_file")
+    ap.add_argument("out_file")
+    ap.add_argument("--engine", choices=("python", "numpy", "matrix", "packed"), default="python",
+                    help="pure-Python column loop, NumPy per pair, batched NumPy rows, "
+                         "or 4-bit packed sequences (same output)")
+    ap.add_argument("--chunk-mb", type=float, default=64,
+                    help="memory budget in MB for one batch of the matrix engine")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="number of worker processes for pairwise scoring")
+    ap.add_argument("--skip-invariant", action="store_true",
+                    help="compare only polymorphic columns; invariant ones are added analytically")
+    ap.add_argument("--cache", metavar="DB",
+                    help="SQLite pair cache; only pairs not cached for these weights are scored")
+    ap.add_argument("--format", choices=("tsv", "gz", "columnar", "condensed"), default="tsv",
+                    help="text table, gzip-compressed text table, binary columns, or condensed float32 matrix")
+    args = ap.parse_args(argv) #argparse exits with code 2 on usage errors
+    if args.jobs < 1:
+        ap.error(f"--jobs must be at least 1 (got {args.jobs})")
+    return args
 def main():
-    if len(sys.argv) != 4:
-        sys.stderr.write("Usage: python ExamineMSA.py fasta_file weight_parameters output_file\n")
-        sys.exit(2) #usage error
-    fasta_file, weights_file, out_file = sys.argv[1], sys.argv[2], sys.argv[3] 
+    args = parse_args(sys.argv[1:])
+    fasta_file, weights_file, out_file = args.fasta_file, args.weights_file, args.out_file
+    if np is None and (args.engine in ("numpy", "matrix") or args.format in ("columnar", "condensed")):
+        sys.stderr.write("[ERROR] --engine numpy/matrix and --format columnar/condensed require NumPy.\n")
+        sys.exit(2)
     # ensure the fasta exists and is readable; if not, exit with code 1.
     try:
         recs = read_fasta(fasta_file)              
@@ -170,23 +676,25 @@ def main():
     W = load_weights(weights_file)
     # prepare the output directory (idempotent: no error if it already exists).
     Path(out_file).parent.mkdir(parents=True, exist_ok=True)
-    # open output file and write a simple header + all pairwise rows.
-    with open(out_file, "w", newline="") as f:
-        # formatting output table header
-        f.write("SampleA | SampleB | Comparable | Uncertain | Total | Identity% | Score\n")
-        n = len(recs)                                
-        for i in range(n):                      #iterate each pair     
-            for j in range(i + 1, n):                
-                a_name, a_seq = recs[i]              
-                b_name, b_seq = recs[j]             
-                # compute pairwise statistics under the selected weights.
-                comp, unc, tot, ident_pct, sc = pair_stats(a_seq, b_seq, W)
-                # formatting output score : integer if exact, else rounded to 3 decimals.
-                sc_out = int(sc) if float(sc).is_integer() else round(sc, 3)
-                # output line formatting
-                f.write(f"{a_name} | {b_name} | {comp} | {unc} | {tot} | {ident_pct:.1f}% | {sc_out}\n")
+    # stream all pairwise rows (i < j) into the output file; only one batch is held in memory.
+    names = [name for name, _ in recs]
+    tally = {}
+    if args.cache:
+        rows = iter_cached_pair_stats(recs, W, args.cache, args.engine, args.chunk_mb, args.skip_invariant, tally,
+                                      args.jobs)
+    else:
+        rows = iter_pair_stats(recs, W, args.engine, args.chunk_mb, args.jobs, args.skip_invariant)
+    del recs #the generator holds the only reference and drops it after encoding
+    if args.format == "columnar":
+        write_columnar(out_file, names, rows)
+    elif args.format == "condensed":
+        write_condensed(out_file, names, rows)
+    else:
+        write_tsv(out_file, names, rows, compress=(args.format == "gz"))
     # success message to stdout
     print(f"[OK] Aligned length={aln_len}. Wrote: {out_file}")
+    if args.cache:
+        print(f"[OK] Cache {args.cache}: {tally['reused']} pairs reused, {tally['computed']} computed.")
 
 
 # Standard Python script entry-point guard.
@@ -17,17 +17,32 @@ User-defined functions:
     clean_seq(raw)
        Standardize a raw sequence string: convert to uppercase, replace similar
         symbols (—/–/− → '-', '？' → '?'), keep only A/C/G/T/N/?/-, and replace
-        all other symbols with 'N'.
-    write_fasta(path, entries)
-        Write (name, sequence) pairs to a FASTA file (80 characters per line),
-        skipping empty entries.
+        all other symbols with 'N'. Done with translation tables (bytes.translate
+        for ASCII input) instead of a loop per character.
+    clean_seq_count(raw) -> (seq, n_invalid)
+        clean_seq plus the number of symbols turned into 'N'; the parsers add it to
+        their qc dict with add_invalid(qc, n_invalid).
+    write_fasta(path, entries, width)
+        Write (name, sequence) pairs to a FASTA file (80 characters per line by
+        default, width <= 0 for one line per sequence), skipping empty entries.
+        Each record is formatted into one string (format_entry) and written with a
+        single call through a 1 MiB buffer; sanitized names are cached (safe_name).
+        Paths ending in .gz are written gzip-compressed (level 6, like ExamineMSA).
+    write_records(paths, records, width)
+        Stream (type, name, sequence) records into one FASTA file per type
+        (paths = {"mtDNA": ..., "Y": ...}); only one record is held at a time.
+    The three parsers read any iterable of lines (e.g. an open file) and are
+    generators yielding (type, name, sequence) records, type "mtDNA" or "Y", in
+    input order. They raise ValueError before yielding anything when the input
+    is not in their format.
     parse_fasta_like(lines)
         Extract sequences from FASTA-style headers:
         >Name|TYPE=mtDNA or >Name|TYPE=Y.
     parse_table(lines)
         Detect and extract sequences from delimited tables (CSV, TSV, semicolon,
         or pipe-separated). The table must contain a name column and
-        at least one ggene sequence column (mtDNA or Y).
+        at least one ggene sequence column (mtDNA or Y). The delimiter and the
+        columns are chosen from the header line alone (table_columns).
     parse_block(lines)
         Detect and extract sequences from block-style records of the form:
             <Sample Name>
@@ -36,17 +51,34 @@ User-defined functions:
             <multi-line sequence>
             Y chromosome
             <multi-line sequence>
-    dedup_rename(entries)
-        Rename duplicated entries by name, keeping the first occurrence.
+    sniff_format(sample)
+        Decide "fasta", "table" or "block" from the first lines of the file only
+        (SNIFF_BYTES, 64 KiB): a >Name|TYPE= header → fasta, a header line with a
+        name and an mtDNA/Y column → table, anything else → block.
+    iter_parallel_records(lines, fmt, qc, jobs)
+        --jobs: cut the file into chunks of about CHUNK_BYTES at record boundaries
+        (iter_chunks: before a '>' header, before a sample name that follows a blank
+        line, or between table rows, with the header line repeated in every chunk),
+        parse and clean them in a process pool (parse_chunk) and yield the records
+        in file order; renaming stays serial, so the output equals the serial run.
+    dedup_rename(records, qc)
+        Rename duplicated names within each type (name, name_2, name_3, ...),
+        keeping the first occurrence; a generator over (type, name, sequence).
+    dedup_content(records, qc)
+        --dedup-content: drop records whose sequence was already seen for the same
+        type (under any name); the seen set holds one 8-byte BLAKE2b digest per
+        unique sequence, so memory grows with unique sequences, not with bases.
     summarize(entries, label, qc)
         Summarize the number of sequences, length range, and how well the alignments are.
     count_chars(entries)
         Calculate total counts of A/C/G/T/N/?/- and total base length across sequences.
 Procedure:
-    1) Read the input text file and try parsers in this order:
-         FASTA-like → delimited table → block-style.
+    1) Read a bounded prefix of the input, decide its format from it (FASTA-like →
+       delimited table → block-style, unless --format is given), then stream the
+       whole file once through that one parser.
     2) Clean all sequences to retain only valid symbols (A/C/G/T/N/?/-).
-    3) Remove duplicate names, keeping the first entry of each individual.
+    3) Remove duplicate names, keeping the first entry of each individual
+       (with --dedup-content, identical sequences are dropped first).
     4) Write two FASTA outputs:
          <output_prefix>_mtDNA.fasta
          <output_prefix>_Y.fasta
@@ -58,13 +90,19 @@ Outputs:
     <output_prefix>_mtDNA.fasta  — cleaned mtDNA sequences.
     <output_prefix>_Y.fasta      — cleaned Y-chromosome sequences.
 Usage:
-    python FastaParser.py INPUT_TXT OUTPUT_PREFIX
+    python FastaParser.py INPUT_TXT OUTPUT_PREFIX [--format auto|fasta|table|block]
+                          [--width W] [--gzip] [--jobs N] [--dedup-content]
+    --format: skip format detection and use this parser (default auto).
+    --width : sequence characters per output line (default 80, 0 = no wrapping).
+    --gzip  : write <output_prefix>_mtDNA.fasta.gz and <output_prefix>_Y.fasta.gz.
+    --jobs N: parse and clean the input in N worker processes (same output).
+    --dedup-content: drop sequences identical to an earlier one of the same type.
 Example:
     python FastaParser.py "GeneticData - 6.txt" outputs/Group6
 Exit codes:
     0  success
     1  input file not found
-    2  unsupported or unrecognized input format
+    2  unsupported or unrecognized input format, or command-line usage error
 Version: 1.0
 Date:    2025-10-24
 Author:  Yiran Chen
@@ -72,55 +110,115 @@ Author:  Yiran Chen
 #%% importing library
 from pathlib import Path  # object-oriented filesystem paths.
 import sys  # intepreter utility(e.g., argv, exit).
+import argparse  # command-line options.
 import os   # OS interfaces (paths,etc).
 import csv  # CSV parsing and writing.
 import re   # regular expressions.
+import itertools  # putting the sniffed lines back in front of the stream.
+import gzip  # optional compressed output.
+import multiprocessing  # --jobs: parsing chunks in worker processes.
+import io  # chunk text read back as lines in the workers.
+import hashlib  # compact keys of the name index and the sequence set.
+from collections import deque  # chunks in flight.
+from functools import lru_cache  # sanitized sample names.
+from contextlib import ExitStack  # one open output file per sequence type.
 #%% global definition of allowed character set
 ALLOWED = set("ACGTN?-")
+WHITESPACE = "\t\r\n " #skipped inside sequences
+#ASCII input: every byte maps to itself if allowed, else to "N"; whitespace is deleted
+CLEAN_BYTES = bytes(b if chr(b) in ALLOWED else ord("N") for b in range(256))
+SKIP_BYTES = WHITESPACE.encode("ascii")
+KEEP_BYTES = SKIP_BYTES + "".join(sorted(ALLOWED)).encode("ascii") #deleting these leaves the invalid symbols
+#other input: similar symbols to standard ones and whitespace deleted, then the rest to "N" by regex
+SIMILAR = str.maketrans({"—": "-", "–": "-", "−": "-", "？": "?", **dict.fromkeys(WHITESPACE)})
+INVALID_RE = re.compile(r"[^ACGTN?\-]")
+def new_qc():
+    #symbols turned into N, sequences with any of them, names renamed, identical sequences dropped
+    return {"invalid": 0, "invalid_seqs": 0, "renamed": 0, "dropped": 0}
+def add_invalid(qc, bad):
+    if qc is not None and bad:
+        qc["invalid"] += bad
+        qc["invalid_seqs"] += 1
 #%% the function of clean raw sequence data
 def clean_seq(raw):#rawseq should be strings
+    return clean_seq_count(raw)[0]
+def clean_seq_count(raw):#cleaned sequence and the number of symbols turned into N
     s = (raw or "").strip().upper() #remove whitespace and upper all letters，if the string is empty,use ""
-    s = (s.replace("—","-").replace("–","-").replace("−","-").replace("？","?"))#change similar symbols to standard ones
-    out = [] #initialize one empty out list
-    for ch in s: #iterate through
-        if ch in ALLOWED:
-            out.append(ch) #add valid characters to cleaned output
-        elif ch in "\t\r\n ": #skip whitespaces
-            continue
-        else:  #other not valid characters output as "N"
-            out.append("N")
-    return "".join(out) #join the segment of cleaned data together
+    if s.isascii(): #C-level byte translation: no similar symbols possible, only allowed/whitespace/other
+        b = s.encode("ascii")
+        #bytes.translate cannot count what it replaces: a second translate deleting every kept byte
+        #leaves only the invalid symbols (faster than counting N in the input and the output)
+        bad = len(b.translate(None, KEEP_BYTES))
+        return b.translate(CLEAN_BYTES, SKIP_BYTES).decode("ascii"), bad
+    return INVALID_RE.subn("N", s.translate(SIMILAR)) #change similar symbols, then others to N
 #%% the function of writing (name, sequence) pairs to a FASTA file 
-def write_fasta(path, entries):#entries be like list(tuple(name,sequence))
+LINE_WIDTH = 80 #characters per sequence line
+WRITE_BUFFER = 1 << 20 #bytes collected before the file is written
+NAME_RE = re.compile(r"[^A-Za-z0-9 _.\-'\(\)\+/[\]]")
+@lru_cache(maxsize=65536)
+def safe_name(name):
+    return NAME_RE.sub("_", name) #remove illegal name character
+def open_fasta(path):
     p = Path(path) #convert string or os.PathLike to a Path object
     p.parent.mkdir(parents=True, exist_ok=True) #ensure the parent directory exists (no error if already exists)
-    with p.open("w", encoding="utf-8", newline="") as file:
+    if p.suffix == ".gz":
+        return gzip.open(p, "wt", compresslevel=6, encoding="utf-8", newline="") #level 9 is much slower for little gain
+    return p.open("w", buffering=WRITE_BUFFER, encoding="utf-8", newline="")
+def format_entry(name, seq, width=LINE_WIDTH):
+    if 0 < width < len(seq): #keep it to width characters per line
+        seq = "\n".join([seq[i:i+width] for i in range(0, len(seq), width)])
+    return f">{safe_name(name)}\n{seq}\n" #the whole record as one string
+def write_entry(file, name, seq, width=LINE_WIDTH):
+    if not name or not seq: #skip the empty lines which without sample name or dna sequences
+        return False
+    file.write(format_entry(name, seq, width)) #one write per record
+    return True
+def write_fasta(path, entries, width=LINE_WIDTH):#entries be like list(tuple(name,sequence)) or any iterable of them
+    with open_fasta(path) as file:
         for name, seq in entries:
-            if not name or not seq: #skip the empty lines which without sample name or dna sequences
-                continue 
-            safe_name = re.sub(r"[^A-Za-z0-9 _.\-'\(\)\+/[\]]", "_", name) #remove illegal name character
-            file.write(f">{safe_name}\n") #write out the output file
-            for i in range(0, len(seq), 80):#keep it to 80 characters per line
-                file.write(seq[i:i+80] + "\n")
+            write_entry(file, name, seq, width)
+def write_records(paths, records, width=LINE_WIDTH):#paths be like {"mtDNA": path, "Y": path}, records (type, name, sequence)
+    written = dict.fromkeys(paths, 0) #number of sequences written per type
+    with ExitStack() as stack:
+        files = {t: stack.enter_context(open_fasta(p)) for t, p in paths.items()}
+        for typ, name, seq in records: #records are consumed one by one, never collected
+            if write_entry(files[typ], name, seq, width):
+                written[typ] += 1
+    return written
 #%% the function of recognizing duplications and renaming duplicated ones
-def dedup_rename(entries):
-    counts = {} #initiate empty count of name and output
-    out = [] #initiate an empty list output
-    for name, seq in entries: #unpack and get name, seq, like dict.items() for dict
+def dedup_rename(records, qc=None):
+    counts = {} #initiate empty count per (type, name)
+    for typ, name, seq in records: #unpack and get type, name, seq as the parser yields them
         if not name: #skip empty sample id
             continue
-        if name in counts: #if id name already exists, update duplication count
-            counts[name] += 1
-            new_name = f"{name}_{counts[name]}" #like anastasia_002, if have alike duplications
+        key = (typ, name) #mtDNA and Y names are numbered separately
+        if key in counts: #if id name already exists, update duplication count
+            counts[key] += 1
+            new_name = f"{name}_{counts[key]}" #like anastasia_002, if have alike duplications
+            if qc is not None:
+                qc["renamed"] += 1
         else:
-            counts[name] = 1 
+            counts[key] = 1 
             new_name = name #keep the original name
-        out.append((new_name, seq))#update duplicated names
-    return out
+        yield typ, new_name, seq #update duplicated names
+#%% the function of dropping sequences identical to an earlier one
+DIGEST_SIZE = 8 #bytes per seen sequence; a collision needs billions of distinct sequences to become likely
+def digest(typ, text):
+    return hashlib.blake2b(f"{typ}\0{text}".encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+def dedup_content(records, qc=None):
+    seen = set() #(type, sequence) digests
+    for typ, name, seq in records:
+        if seq: #empty sequences are skipped by the writer anyway
+            key = digest(typ, seq)
+            if key in seen:
+                if qc is not None:
+                    qc["dropped"] += 1
+                continue
+            seen.add(key)
+        yield typ, name, seq
 #%% three parser functions(fasta-like / table / block) 
 header_re = re.compile(r"^>([^|\r\n]+)\|TYPE=(mtDNA|Y)$", re.I) #match with start with ">" and with TYPE=mtdna or Y,ignore uppercase or lowercase
-def parse_fasta_like(lines):#fasta-like name and seq lines
-    mt, yy = [], [] #initiate empty list for mtdna and y chromosome
+def parse_fasta_like(lines, qc=None):#fasta-like name and seq lines; qc collects the clean_seq_count counts
     cur_name= None #current name
     cur_type= None #current type(mtdna, y)
     cur_buf=[]#buffer for the current sequence's chunks (collect lines until finish this entry)
@@ -130,8 +228,9 @@ def parse_fasta_like(lines):#fasta-like name and seq lines
         if m:
             seen = True #mark there are at least one valid line with name and seq
             if cur_name and cur_type: #processing with the previous entry before moving to next
-                seq = clean_seq("".join(cur_buf)) #join buffered segments together
-                (mt if cur_type.lower()=="mtdna" else yy).append((cur_name, seq)) #assigned to different types
+                seq, bad = clean_seq_count("".join(cur_buf)) #join buffered segments together
+                add_invalid(qc, bad)
+                yield ("mtDNA" if cur_type.lower()=="mtdna" else "Y"), cur_name, seq #assigned to different types
             # initialize a new entry from the header capture groups
             cur_name = m.group(1).strip()#split the line into sample name and type
             cur_type = m.group(2)
@@ -139,134 +238,249 @@ def parse_fasta_like(lines):#fasta-like name and seq lines
         else:
             if cur_name is not None: #not a header line: if inside a record, accumulate sequence content.
                 cur_buf.append(ln.strip()) #added the buffer sequences to already exists entry
+    if not seen: #if no headers were seen at all, indicate that nothing was parsed.
+        raise ValueError("no >Name|TYPE=mtDNA or >Name|TYPE=Y header found")
     if cur_name and cur_type: #commit if there are pending buffers
-        seq = clean_seq("".join(cur_buf))
-        (mt if cur_type.lower()=="mtdna" else yy).append((cur_name, seq))
-    return (mt, yy) if seen else (None, None)#if no headers were seen at all, indicate that nothing was parsed.
+        seq, bad = clean_seq_count("".join(cur_buf))
+        add_invalid(qc, bad)
+        yield ("mtDNA" if cur_type.lower()=="mtdna" else "Y"), cur_name, seq
 #the parser for tables
-def parse_table(lines):#list of string of sequences
-    text = "".join(lines) #rebuild the full text; splitlines() below will handle any newline style.
+def table_columns(header_line):#the first line of the file
     for delim in [",", "\t", ";", "|"]:
         try:
-            rows = list(csv.reader(text.splitlines(), delimiter=delim)) #split rows by dilimiter
-            if not rows:  #skip empty rows
-                continue
-            headers = [h.strip().lower() for h in rows[0]] #normalize header cells for robust matching (trim + lowercase)
-            name_idx = mt_idx = y_idx = None #placeholders for column indices
-            for i, h in enumerate(headers):#like 0,name;1,mtdna;2,ydna
-                if name_idx is None and (h in ("name","sample","id") or "name" in h or "sample" in h): #several possible expressions for sample id
-                    name_idx = i 
-                if mt_idx is None and "mtdna" in h: #several possible expressions for mtdna
-                    mt_idx = i
-                if y_idx is None and (
-                    h == "y" or "y_dna" in h or "ychrom" in h or "y-chrom" in h
-                    or h == "ychromosome" or h == "y chromosome"
-                ):
-                    y_idx = i
-            if name_idx is None or (mt_idx is None and y_idx is None):#if this delimiter guess fails,try the next one.
-                continue
-            mt, yy = [], [] #accumulator for parsed (name, sequence) pairs by type.
-            for r in rows[1:]: #iterate over data rows (skip the header at index 0)
-                if not r: 
-                    continue
-                name = (r[name_idx] if name_idx < len(r) else "").strip() #name colomun number must less than the row length
-                if not name: 
-                    continue
-                if mt_idx is not None and mt_idx < len(r):
-                    seq_mt = clean_seq(r[mt_idx]) 
-                    if seq_mt: mt.append((name, seq_mt)) #append (name, mtDNA) to the accumulator.
-                if y_idx is not None and y_idx < len(r):
-                    seq_y = clean_seq(r[y_idx]) 
-                    if seq_y: yy.append((name, seq_y)) #append (name, Y-DNA) to the accumulator
-            return mt, yy
-        except Exception: #parsing failed under this delimiter speculation,try the next candidate
+            row = next(csv.reader([header_line], delimiter=delim), []) #split the header by dilimiter
+        except csv.Error: #parsing failed under this delimiter speculation,try the next candidate
             continue
-    return None, None #no usable delimiter detected across all candidates
+        headers = [h.strip().lower() for h in row] #normalize header cells for robust matching (trim + lowercase)
+        name_idx = mt_idx = y_idx = None #placeholders for column indices
+        for i, h in enumerate(headers):#like 0,name;1,mtdna;2,ydna
+            if name_idx is None and (h in ("name","sample","id") or "name" in h or "sample" in h): #several possible expressions for sample id
+                name_idx = i 
+            if mt_idx is None and "mtdna" in h: #several possible expressions for mtdna
+                mt_idx = i
+            if y_idx is None and (
+                h == "y" or "y_dna" in h or "ychrom" in h or "y-chrom" in h
+                or h == "ychromosome" or h == "y chromosome"
+            ):
+                y_idx = i
+        if name_idx is None or (mt_idx is None and y_idx is None):#if this delimiter guess fails,try the next one.
+            continue
+        return delim, name_idx, mt_idx, y_idx
+    return None #no usable delimiter detected across all candidates
+def parse_table(lines, qc=None):#iterable of lines, e.g. an open file
+    lines = iter(lines)
+    header = next(lines, "").rstrip("\r\n")
+    cols = table_columns(header)
+    if cols is None:
+        raise ValueError("no name column and mtDNA/Y column in the table header")
+    delim, name_idx, mt_idx, y_idx = cols
+    for r in csv.reader(lines, delimiter=delim): #iterate over data rows (the header is already read)
+        if not r: 
+            continue
+        name = (r[name_idx] if name_idx < len(r) else "").strip() #name colomun number must less than the row length
+        if not name: 
+            continue
+        if mt_idx is not None and mt_idx < len(r):
+            seq_mt, bad = clean_seq_count(r[mt_idx])
+            add_invalid(qc, bad)
+            if seq_mt: yield "mtDNA", name, seq_mt #emit (name, mtDNA)
+        if y_idx is not None and y_idx < len(r):
+            seq_y, bad = clean_seq_count(r[y_idx])
+            add_invalid(qc, bad)
+            if seq_y: yield "Y", name, seq_y #emit (name, Y-DNA)
 #%% the parser for block-style fasta-like files
-def parse_block(lines):
-    # treat several variants as types and ignore phenotype lines as names
-    def is_mt_title(s):
-        low = s.lower().strip() 
-        return low in ("mtdna", "mt dna", "mitochondrial dna") #common mtDNA block titles
-    def is_y_title(s):
-        low = s.lower().strip()
-        return low in ("y chromosome","y-chromosome","ychromosome","y")#common Y-chromosome titles
-    def is_phenotype(s):
-        low = s.lower().strip() #phenotype about hemophilia
-        return low.startswith("a hemophilia") or low.startswith("not a hemophilia") 
-        #phenotype annotations should not be treated as sample names
+# treat several variants as types and ignore phenotype lines as names
+def is_mt_title(s):
+    low = s.lower().strip() 
+    return low in ("mtdna", "mt dna", "mitochondrial dna") #common mtDNA block titles
+def is_y_title(s):
+    low = s.lower().strip()
+    return low in ("y chromosome","y-chromosome","ychromosome","y")#common Y-chromosome titles
+def is_phenotype(s):
+    low = s.lower().strip() #phenotype about hemophilia
+    return low.startswith("a hemophilia") or low.startswith("not a hemophilia") 
+    #phenotype annotations should not be treated as sample names
+def parse_block(lines, qc=None):
     def norm_name(s) :
         s = s.strip()
         if s.startswith(">"):   
             s = s[1:].strip() #get normailzed name
         return s
     def flush(buf): #join buffered sequence fragments, trim whitespace, then clean data
-        return clean_seq("".join(part.strip() for part in buf if part.strip()))
-    #initialize placeholder for mtdna and ydna
-    mt, yy = [], [] #accumulators for parsed (name, sequence) tuples: mtDNA -> mt, Y-DNA -> yy
+        seq, bad = clean_seq_count("".join(part.strip() for part in buf if part.strip()))
+        add_invalid(qc, bad)
+        return seq
     name= None # current sample name being processed; none means no active sample yet.
-    mode= None # current block type: "mt" for mtDNA, "y" for Y-DNA, or None when not in a block.
+    mode= None # current block type: "mtDNA" or "Y", or None when not in a block.
     buf = [] # line buffer for sequence fragments until commiting a record
+    found = False # at least one record emitted
     def commit():
-        nonlocal buf, mode, name # mutate the outer-scope variables declared above,not creating new local variables
-        if not name or not mode:
-            buf.clear(); mode = None; return  #incomplete record (missing name or type): reset and do nothing.
-        seq = flush(buf)#join + clean buffered sequence fragments via flush() to clean_seq( )
-        if seq:
-            (mt if mode=="mt" else yy).append((name, seq)) #append (name, sequence) to the proper accumulator.
+        nonlocal mode # mutate the outer-scope variable declared above,not creating a new local variable
+        rec = None
+        if name and mode: #incomplete record (missing name or type): reset and emit nothing.
+            seq = flush(buf)#join + clean buffered sequence fragments via flush() to clean_seq( )
+            if seq:
+                rec = (mode, name, seq) #(type, name, sequence) for the caller to emit
         buf.clear(); mode = None #reset the buffer and exit block mode for the next record.
+        return rec
     #iterate over each raw input line.
     for raw in lines:
         s = raw.strip()
-        if not s:
-            commit() #finalize any pending record before resetting contextual state
+        # blank lines end a record; titles end it and start a new block
+        title = None if not s else "mtDNA" if is_mt_title(s) else "Y" if is_y_title(s) else None
+        if not s or title:
+            rec = commit() #finalize any pending record before resetting contextual state
+            if rec:
+                found = True
+                yield rec
+            mode = title # enter mtDNA/Y mode (None after a blank line)
             continue
-        # titles
-        if is_mt_title(s): #check line for block header types
-            commit(); mode = "mt"; continue # flush previous record, enter mtDNA mode
-        if is_y_title(s):
-            commit(); mode = "y";continue
         # inside sequence collection
-        if mode in ("mt","y"):
+        if mode:
             buf.append(s); continue
         if is_phenotype(s):
             #treat phenotype not as name
             continue
         # treat as a (new) sample name
         name = norm_name(s)
-    commit()
-    return (mt, yy) if (mt or yy) else (None, None)
+    rec = commit()
+    if rec:
+        yield rec
+    elif not found:
+        raise ValueError("no Name / mtDNA / Y chromosome blocks found")
+#%% format detection from the beginning of the file
+SNIFF_BYTES = 64 * 1024 #size of the prefix sample used to decide the format
+PARSERS = {"fasta": parse_fasta_like, "table": parse_table, "block": parse_block}
+def read_sample(f, limit=SNIFF_BYTES):
+    sample, size = [], 0 #whole lines, until about limit characters
+    for ln in f:
+        sample.append(ln)
+        size += len(ln)
+        if size >= limit:
+            break
+    return sample
+def sniff_format(sample):#first lines of the file
+    # same order as the parsers were tried before: fasta-like, table, block
+    if any(header_re.match(ln.strip()) for ln in sample):
+        return "fasta"
+    if sample and table_columns(sample[0].rstrip("\r\n")) is not None:
+        return "table"
+    return "block"
+#%% parallel parsing: the file cut into chunks at record boundaries, parsed in worker processes
+CHUNK_BYTES = 4 << 20 #characters per chunk, rounded up to the next record boundary
+def starts_record(fmt, ln, prev_blank, quotes):
+    #True when the file can be cut before line ln without changing what the parser reads
+    if fmt == "fasta":
+        return header_re.match(ln.strip()) is not None #a new >Name|TYPE= header
+    if fmt == "table":
+        return quotes % 2 == 0 #not inside a quoted csv field that spans lines
+    s = ln.strip() #block: a sample name after a blank line (the parser forgets the old name there)
+    return prev_blank and bool(s) and not (is_mt_title(s) or is_y_title(s) or is_phenotype(s))
+def iter_chunks(lines, fmt, size=CHUNK_BYTES):
+    lines = iter(lines)
+    head = [next(lines, "")] if fmt == "table" else [] #every table chunk starts with the header line
+    chunk, n, quotes, prev_blank, emitted = list(head), 0, 0, False, False
+    for ln in lines:
+        if n >= size and starts_record(fmt, ln, prev_blank, quotes):
+            yield chunk
+            chunk, n, quotes, emitted = list(head), 0, 0, True
+        chunk.append(ln)
+        n += len(ln)
+        if fmt == "table":
+            quotes += ln.count('"')
+        prev_blank = not ln.strip()
+    if len(chunk) > len(head) or not emitted:
+        yield chunk
+def parse_chunk(task):
+    fmt, text = task #runs in a worker process; the chunk arrives as one string (cheap to pickle)
+    qc = new_qc()
+    try:
+        return list(PARSERS[fmt](io.StringIO(text), qc)), qc, None
+    except ValueError as e: #this chunk holds no records of the format
+        return None, qc, str(e)
+def iter_parallel_records(lines, fmt, qc, jobs):
+    #same records in the same order as PARSERS[fmt](lines, qc), parsed and cleaned in jobs processes
+    found, error = False, None
+    with multiprocessing.Pool(jobs) as pool:
+        window = deque() #at most 2*jobs chunks in flight, so memory stays bounded
+        def results():
+            for chunk in iter_chunks(lines, fmt):
+                window.append(pool.apply_async(parse_chunk, ((fmt, "".join(chunk)),)))
+                if len(window) >= 2 * jobs:
+                    yield window.popleft().get() #oldest first: records keep the file order
+            while window:
+                yield window.popleft().get()
+        for records, part, err in results():
+            for k in qc:
+                qc[k] += part[k]
+            if records is None:
+                error = err
+                continue
+            found = True
+            yield from records
+    if not found: #like the serial parsers: no record in any chunk, nothing yielded
+        raise ValueError(error or f"no {fmt} records found")
 #%% main function
+def parse_args(argv):
+    ap = argparse.ArgumentParser(prog="FastaParser.py",
+                                 description="Clean GeneticData sequences into mtDNA and Y FASTA files.")
+    ap.add_argument("input_txt", help="GeneticData text file")
+    ap.add_argument("output_prefix", help="writes <prefix>_mtDNA.fasta and <prefix>_Y.fasta")
+    ap.add_argument("--format", choices=["auto"] + list(PARSERS), default="auto",
+                    help="input format; auto decides from the first %d KiB" % (SNIFF_BYTES // 1024))
+    ap.add_argument("--width", type=int, default=LINE_WIDTH,
+                    help="sequence characters per line (default %(default)s; 0 = one line per sequence)")
+    ap.add_argument("--gzip", action="store_true", help="write <prefix>_mtDNA.fasta.gz and <prefix>_Y.fasta.gz")
+    ap.add_argument("--jobs", type=int, default=1, metavar="N",
+                    help="parse and clean chunks of the file in N worker processes")
+    ap.add_argument("--dedup-content", action="store_true",
+                    help="drop sequences identical to an earlier one of the same type (any name)")
+    args = ap.parse_args(argv) #usage errors exit with code 2
+    if args.jobs < 1:
+        ap.error(f"--jobs must be at least 1 (got {args.jobs})")
+    return args
 def main():
-    if len(sys.argv) != 3:
-        sys.stderr.write("Usage: python FastaParser.py input_fasta output_fasta_file\n")
-        sys.exit(2) #exit code 2: command-line usage error
-    input_fasta = sys.argv[1] #path for input file
-    out_prefix = sys.argv[2] #path for output file
+    args = parse_args(sys.argv[1:])
+    input_fasta = args.input_txt #path for input file
+    out_prefix = args.output_prefix #path for output file
     if not os.path.isfile(input_fasta): # existence check for the input file.
         sys.stderr.write(f"[ERROR] Input not found: {input_fasta}\n"); sys.exit(1)
-    #read the entire input as lines 
+    ext = ".fasta.gz" if args.gzip else ".fasta"
+    out_mt = f"{out_prefix}_mtDNA{ext}"
+    out_y  = f"{out_prefix}_Y{ext}"
     with open(input_fasta, "r",errors="ignore") as f:
-        lines = f.readlines()
-    mt, yy = parse_fasta_like(lines) # parsing as a fasta-like format first
-    if mt is None and yy is None:
-        mt, yy = parse_table(lines)#try parsing as a delimited table
-    if mt is None and yy is None:
-        mt, yy = parse_block(lines)#try parsing as a block
-    if mt is None and yy is None:
-        sys.stderr.write("[ERROR] Could not detect input format.\n"); sys.exit(2)
-        #if all parsers failed, report an error and stop.
-    # returns a list of (name, sequence) with unique names.
-    mt = dedup_rename(mt)
-    yy = dedup_rename(yy)
-    out_mt = f"{out_prefix}_mtDNA.fasta"
-    out_y  = f"{out_prefix}_Y.fasta"
-    write_fasta(out_mt, mt)
-    write_fasta(out_y, yy)
-    print(f"[OK] Wrote: {out_mt} and {out_y}") #print successful message
-#Standard Python entry point guard
-if __name__ == "__main__":
-    main()
+        fmt = args.format
+        lines = f
+        if fmt == "auto":
+            sample = read_sample(f) #bounded prefix; put back in front of the rest of the file
+            fmt = sniff_format(sample)
+            lines = itertools.chain(sample, f)
+        qc = new_qc() #filled from clean_seq_count while the records stream through
+        if args.jobs > 1: #exactly one parser streams the whole file, here or in worker processes
+            records = iter_parallel_records(lines, fmt, qc, args.jobs)
+        else:
+            records = PARSERS[fmt](lines, qc)
+        try:
+            first = next(records) #a parser rejects the input before its first record
+            records = itertools.chain([first], records)
+        except StopIteration:
+            pass #right format, but no sequences
+        except ValueError as e:
+            if args.format == "auto":
+                sys.stderr.write(f"[ERROR] Could not detect input format ({fmt}: {e}).\n")
+            else:
+                sys.stderr.write(f"[ERROR] Input is not in {fmt} format: {e}.\n")
+            sys.exit(2)
+            #if the parser finds nothing it can read, report an error and stop.
+        if args.dedup_content: #before renaming: dropped records do not take a number
+            records = dedup_content(records, qc)
+        # unique names per type, written as the records arrive
+        written = write_records({"mtDNA": out_mt, "Y": out_y}, dedup_rename(records, qc), args.width)
+    print(f"[OK] Format: {fmt}" + (" (detected)" if args.format == "auto" else ""))
+    print(f"[QC] Sequences written: mtDNA {written['mtDNA']}, Y {written['Y']}; "
+          f"invalid symbols converted to N: {qc['invalid']} in {qc['invalid_seqs']} sequence(s); "
+          f"duplicate names renamed: {qc['renamed']}"
+          + (f"; identical sequences dropped: {qc['dropped']}" if args.dedup_content else ""))
     print(f"[OK] Wrote: {out_mt} and {out_y}") #print successful message
 #Standard Python entry point guard
 if __name__ == "__main__":
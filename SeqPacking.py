@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SeqPacking.py
+
+Description
+-----------
+Compact 4-bit nucleotide representation shared by ExamineMSA.py and FastaAligner.
+Every column is stored as one 4-bit code, two columns per byte:
+    A=0  C=1  G=2  T=3  N=4  ?=5  -=6  any other character=7  (15 pads an odd length)
+A packed sequence needs L/2 bytes, half of a one-byte-per-base str or uint8 array.
+
+Pairwise kernels never unpack: a 65536-entry table maps every (byte_a, byte_b)
+combination, i.e. two alignment columns at once, to the column classes of the
+caller (e.g. MATCH/MISMATCH/GAP for ExamineMSA, MATCH/TRANSITION/... for
+FastaAligner), and the per-class column counts are summed from that table.
+
+User-defined functions
+-   encode(seq: str) -> bytes
+    One code per byte (bytes.translate, no Python loop).
+-   decode(codes: bytes) -> str
+    Inverse of encode (characters outside ACGTN?- come back as 'X').
+-   pack(codes: bytes) -> bytes / unpack(data: bytes, length: int) -> bytes
+    Two codes per byte, high nibble first, and back.
+-   PackedSeq(seq: str)
+    Packed sequence type: len(), str(), codes() and array() (NumPy view of the packed bytes).
+-   pair_table(classify, n_classes) -> Dict
+    Build the byte-pair lookup table for a column classifier classify(code_a, code_b),
+    which returns a class in 0..n_classes-1, or None for columns that are not counted.
+-   class_counts(a: PackedSeq, b: PackedSeq, table) -> List[int]
+    Number of columns in each class for one pair (NumPy if installed, else collections.Counter).
+
+Version: 1.0
+Date   : 2025-10-24
+Author : Yiran Chen
+"""
+#%% importing library
+from collections import Counter #C-level counting of byte pairs when NumPy is missing
+try:
+    import numpy as np #optional: faster table lookups
+except ImportError:
+    np = None
+#%% global definition of codes
+CODES = "ACGTN?-"
+OTHER_CODE = 7
+PAD_CODE = 15
+CHARS = CODES + "X" #decode table; code 7 stands for any other character
+_ENCODE = bytes(CODES.index(chr(b)) if chr(b) in CODES else OTHER_CODE for b in range(256))
+_DECODE = bytes(ord(CHARS[b]) if b < len(CHARS) else ord("X") for b in range(256))
+_HIGH = bytes((b << 4) & 0xFF for b in range(256)) #code -> high nibble
+_HIGH_NIBBLE = bytes(b >> 4 for b in range(256))
+_LOW_NIBBLE = bytes(b & 0x0F for b in range(256))
+#%% the functions of encoding and decoding one code per byte
+def encode(seq):
+    #non-ASCII characters become '?' bytes first, then code 5
+    return seq.encode("ascii", "replace").translate(_ENCODE)
+def decode(codes):
+    return codes.translate(_DECODE).decode("ascii")
+#%% the functions of packing two codes per byte and back
+def pack(codes):
+    high = codes[0::2].translate(_HIGH)
+    low = codes[1::2] + (bytes([PAD_CODE]) if len(codes) % 2 else b"")
+    #OR the two halves as big integers: one C-level pass instead of a loop per byte
+    return (int.from_bytes(high, "big") | int.from_bytes(low, "big")).to_bytes(len(high), "big")
+def unpack(data, length):
+    out = bytearray(2 * len(data))
+    out[0::2] = data.translate(_HIGH_NIBBLE)
+    out[1::2] = data.translate(_LOW_NIBBLE)
+    return bytes(out[:length])
+#%% the packed sequence type
+class PackedSeq:
+    __slots__ = ("data", "length")
+    def __init__(self, seq=""):
+        self.data = pack(encode(seq))
+        self.length = len(seq)
+    @classmethod
+    def from_codes(cls, codes):
+        obj = cls()
+        obj.data = pack(bytes(codes))
+        obj.length = len(codes)
+        return obj
+    def __len__(self):
+        return self.length
+    def __str__(self):
+        return decode(self.codes())
+    def __repr__(self):
+        return f"PackedSeq(length={self.length})"
+    def codes(self):
+        return unpack(self.data, self.length)
+    def array(self):
+        return np.frombuffer(self.data, dtype=np.uint8) #zero-copy view of the packed bytes
+#%% the function of building the byte-pair lookup table for a column classifier
+def pair_table(classify, n_classes):
+    if not 0 < n_classes < 16:
+        raise ValueError("n_classes must be between 1 and 15")
+    skip = n_classes #extra class for columns that are not counted (padding, ignored pairs)
+    width = n_classes + 1
+    def cls(x, y):
+        if x == PAD_CODE or y == PAD_CODE:
+            return skip
+        c = classify(x, y)
+        return skip if c is None else c
+    col = [[cls(x, y) for y in range(16)] for x in range(16)]
+    #one combined code per byte pair: class of the high column * width + class of the low column
+    combo = bytes(col[xa >> 4][xb >> 4] * width + col[xa & 15][xb & 15]
+                  for xa in range(256) for xb in range(256))
+    return {"n": n_classes, "width": width, "combo": combo,
+            "lut": np.frombuffer(combo, dtype=np.uint8) if np is not None else None}
+#%% the function of counting columns per class for one pair of packed sequences
+def class_counts(a, b, table):
+    if len(a) != len(b):
+        raise ValueError("Sequences must have equal length.")
+    n, width = table["n"], table["width"]
+    if table["lut"] is not None:
+        idx = (a.array().astype(np.uint16) << 8) | b.array()
+        hist = np.bincount(table["lut"][idx], minlength=width * width).reshape(width, width)
+        return [int(hist[c, :].sum() + hist[:, c].sum()) for c in range(n)]
+    counts = [0] * width
+    combo = table["combo"]
+    for (xa, xb), k in Counter(zip(a.data, b.data)).items(): #only a few distinct byte pairs
+        c = combo[(xa << 8) | xb]
+        counts[c // width] += k
+        counts[c % width] += k
+    return counts[:n]